@@ -4,10 +4,19 @@
 from __future__ import annotations
 
 import argparse
+import hashlib
 import json
+import mmap
+import os
+import re
 import sys
 from pathlib import Path
 
+try:
+    import orjson
+except ModuleNotFoundError:
+    orjson = None  # type: ignore[assignment]
+
 try:
     import tomllib
 except ModuleNotFoundError:
@@ -16,7 +25,16 @@ except ModuleNotFoundError:
     except ModuleNotFoundError:
         tomllib = None  # type: ignore[assignment]
 
-HTTP_METHODS = {"get", "put", "post", "delete", "patch", "options", "head", "trace"}
+HTTP_METHODS = frozenset({"get", "put", "post", "delete", "patch", "options", "head", "trace"})
+TOML_BARE_VALUES = {"true": True, "false": False}
+# Quotes, escapes, and control characters other than tab need the full decoder.
+TOML_BASIC_STRING_SPECIAL = re.compile(r'["\\\x00-\x08\x0a-\x1f]')
+BUNDLE_STAMP_PATH = "target/contract-docs/contracts-bundle.stamp"
+
+
+def is_nonempty_str(value: object) -> bool:
+    # JSON/TOML decoders never produce str subclasses, so an exact type check suffices.
+    return type(value) is str and value != ""
 
 
 def parse_args() -> argparse.Namespace:
@@ -46,17 +64,46 @@ def parse_args() -> argparse.Namespace:
         default="docs/generated/contracts-bundle.json",
         help="Output path for generated bundle JSON",
     )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Regenerate the bundle even if the local stamp says it is current",
+    )
     return parser.parse_args()
 
 
 def load_json(path: Path) -> dict:
-    with path.open("r", encoding="utf-8") as handle:
-        payload = json.load(handle)
+    if orjson is not None:
+        with path.open("rb") as handle:
+            if os.fstat(handle.fileno()).st_size == 0:
+                # mmap rejects empty files; let orjson raise the usual decode error.
+                payload = orjson.loads(b"")
+            else:
+                with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    with memoryview(mapped) as view:
+                        payload = orjson.loads(view)
+    else:
+        payload = json.loads(path.read_bytes())
     if not isinstance(payload, dict):
         raise ValueError(f"{path} must be a JSON object")
     return payload
 
 
+def dump_json(path: Path, payload: dict) -> None:
+    if orjson is not None:
+        data = orjson.dumps(payload, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS)
+        path.write_bytes(data + b"\n")
+        return
+
+    # Match orjson output (raw UTF-8, no ASCII escaping) so artifacts stay stable
+    # regardless of which encoder is installed.
+    encoder = json.JSONEncoder(indent=2, sort_keys=True, ensure_ascii=False)
+    with path.open("w", encoding="utf-8", newline="\n", buffering=1 << 20) as handle:
+        for chunk in encoder.iterencode(payload):
+            handle.write(chunk)
+        handle.write("\n")
+
+
 def collect_rest_operations(openapi: dict, errors: list[str]) -> list[dict]:
     operations: list[dict] = []
     paths = openapi.get("paths")
@@ -64,24 +111,22 @@ def collect_rest_operations(openapi: dict, errors: list[str]) -> list[dict]:
         errors.append("REST OpenAPI is missing object field: paths")
         return operations
 
-    for path_key in sorted(paths):
-        path_item = paths.get(path_key)
+    for path_key, path_item in paths.items():
         if not isinstance(path_item, dict):
             errors.append(f"REST path item must be an object: {path_key}")
             continue
 
-        for method_key in sorted(path_item):
-            method_lower = method_key.lower()
-            if method_lower not in HTTP_METHODS:
+        for method_key, operation in path_item.items():
+            # OpenAPI method keys are lowercase by spec; only normalize the odd one out.
+            if method_key not in HTTP_METHODS and method_key.lower() not in HTTP_METHODS:
                 continue
-            operation = path_item.get(method_key)
             if not isinstance(operation, dict):
                 errors.append(
                     f"REST operation must be an object: {method_key.upper()} {path_key}"
                 )
                 continue
             operation_id = operation.get("operationId")
-            if not isinstance(operation_id, str) or not operation_id:
+            if not is_nonempty_str(operation_id):
                 errors.append(
                     f"REST operation is missing operationId: {method_key.upper()} {path_key}"
                 )
@@ -96,10 +141,18 @@ def collect_rest_operations(openapi: dict, errors: list[str]) -> list[dict]:
                 }
             )
 
-    operations.sort(key=lambda item: item["operation_id"])
+    # Iteration above follows document order; this sort alone fixes the output order.
+    operations.sort(key=lambda item: (item["operation_id"], item["path"], item["method"]))
     return operations
 
 
+def grpc_proto_schema_ref(body: object) -> object:
+    content = body.get("content") if isinstance(body, dict) else None
+    media = content.get("application/grpc+proto") if isinstance(content, dict) else None
+    schema = media.get("schema") if isinstance(media, dict) else None
+    return schema.get("$ref") if isinstance(schema, dict) else None
+
+
 def collect_grpc_methods(grpc_openapi: dict, errors: list[str]) -> list[dict]:
     methods: list[dict] = []
     paths = grpc_openapi.get("paths")
@@ -107,8 +160,7 @@ def collect_grpc_methods(grpc_openapi: dict, errors: list[str]) -> list[dict]:
         errors.append("gRPC bridge OpenAPI is missing object field: paths")
         return methods
 
-    for path_key in sorted(paths):
-        path_item = paths.get(path_key)
+    for path_key, path_item in paths.items():
         if not isinstance(path_item, dict):
             errors.append(f"gRPC bridge path item must be an object: {path_key}")
             continue
@@ -119,20 +171,10 @@ def collect_grpc_methods(grpc_openapi: dict, errors: list[str]) -> list[dict]:
             continue
 
         grpc_method = path_key[1:] if path_key.startswith("/") else path_key
-        request_schema = (
-            post.get("requestBody", {})
-            .get("content", {})
-            .get("application/grpc+proto", {})
-            .get("schema", {})
-            .get("$ref")
-        )
-        response_schema = (
-            post.get("responses", {})
-            .get("200", {})
-            .get("content", {})
-            .get("application/grpc+proto", {})
-            .get("schema", {})
-            .get("$ref")
+        request_schema = grpc_proto_schema_ref(post.get("requestBody"))
+        responses = post.get("responses")
+        response_schema = grpc_proto_schema_ref(
+            responses.get("200") if isinstance(responses, dict) else None
         )
 
         metadata = post.get("x-openportio-grpc")
@@ -163,16 +205,20 @@ def collect_grpc_methods(grpc_openapi: dict, errors: list[str]) -> list[dict]:
             }
         )
 
-    methods.sort(key=lambda item: item["grpc_method"])
+    methods.sort(key=lambda item: (item["grpc_method"], item["path"]))
     return methods
 
 
 def parse_toml_value(raw: str, line_number: int, errors: list[str]) -> object:
+    if raw in TOML_BARE_VALUES:
+        return TOML_BARE_VALUES[raw]
+    if len(raw) >= 2 and raw[0] == '"' and raw[-1] == '"':
+        inner = raw[1:-1]
+        if TOML_BASIC_STRING_SPECIAL.search(inner) is None:
+            return inner
     try:
         return json.loads(raw)
     except json.JSONDecodeError:
-        if raw.isdigit():
-            return int(raw)
         errors.append(f"links.toml line {line_number}: unsupported value: {raw}")
         return None
 
@@ -184,40 +230,41 @@ def parse_links_toml(links_path: Path, errors: list[str]) -> dict:
     section = "root"
     current_link: dict | None = None
 
-    with links_path.open("r", encoding="utf-8") as handle:
-        for line_number, line in enumerate(handle, start=1):
-            stripped = line.split("#", 1)[0].strip()
-            if not stripped:
-                continue
-            if stripped == "[coverage]":
+    text = links_path.read_text(encoding="utf-8")
+    for line_number, line in enumerate(text.split("\n"), start=1):
+        comment = line.find("#")
+        if comment >= 0:
+            line = line[:comment]
+        line = line.strip()
+        if not line:
+            continue
+        if line[0] == "[":
+            if line == "[coverage]":
                 section = "coverage"
                 current_link = None
                 continue
-            if stripped == "[[links]]":
+            if line == "[[links]]":
                 section = "links"
                 current_link = {}
                 links.append(current_link)
                 continue
-            if "=" not in stripped:
-                errors.append(f"links.toml line {line_number}: expected key = value")
-                continue
+        eq = line.find("=")
+        if eq < 0:
+            errors.append(f"links.toml line {line_number}: expected key = value")
+            continue
 
-            key, value_raw = stripped.split("=", 1)
-            key = key.strip()
-            value_raw = value_raw.strip()
-            value = parse_toml_value(value_raw, line_number, errors)
+        key = line[:eq].rstrip()
+        value = parse_toml_value(line[eq + 1 :].lstrip(), line_number, errors)
 
-            if section == "coverage":
-                coverage[key] = value
-            elif section == "links":
-                if current_link is None:
-                    errors.append(
-                        f"links.toml line {line_number}: key outside [[links]] block"
-                    )
-                    continue
-                current_link[key] = value
-            else:
-                root[key] = value
+        if section == "coverage":
+            coverage[key] = value
+        elif section == "links":
+            if current_link is None:
+                errors.append(f"links.toml line {line_number}: key outside [[links]] block")
+                continue
+            current_link[key] = value
+        else:
+            root[key] = value
 
     root["coverage"] = coverage
     root["links"] = links
@@ -254,7 +301,7 @@ def load_links(links_path: Path, errors: list[str]) -> tuple[dict, list[dict]]:
             continue
         for key in ("rest_operation_id", "grpc_method"):
             value = link.get(key)
-            if not isinstance(value, str) or not value:
+            if not is_nonempty_str(value):
                 errors.append(f"links[{idx}] requires non-empty string: {key}")
 
     return coverage, links
@@ -263,9 +310,7 @@ def load_links(links_path: Path, errors: list[str]) -> tuple[dict, list[dict]]:
 def as_sorted_string_set(value: object, field_name: str, errors: list[str]) -> list[str]:
     if value is None:
         return []
-    if not isinstance(value, list) or not all(
-        isinstance(item, str) and item for item in value
-    ):
+    if not isinstance(value, list) or not all(is_nonempty_str(item) for item in value):
         errors.append(f"{field_name} must be an array of non-empty strings")
         return []
     return sorted(set(value))
@@ -287,20 +332,19 @@ def sanitize_repo_relative_path(
     if ".." in candidate.parts:
         raise ValueError(f"{arg_name} cannot contain parent-directory traversal ('..')")
 
+    # repo_root and allowed_root are resolved once by the caller.
     resolved = (repo_root / candidate).resolve(strict=False)
-    repo_root_resolved = repo_root.resolve()
-    allowed_root_resolved = allowed_root.resolve()
 
     try:
-        resolved.relative_to(repo_root_resolved)
+        resolved.relative_to(repo_root)
     except ValueError as err:
         raise ValueError(f"{arg_name} escapes repository root") from err
 
     try:
-        resolved.relative_to(allowed_root_resolved)
+        resolved.relative_to(allowed_root)
     except ValueError as err:
         raise ValueError(
-            f"{arg_name} must stay under {allowed_root_resolved.relative_to(repo_root_resolved)}"
+            f"{arg_name} must stay under {allowed_root.relative_to(repo_root)}"
         ) from err
 
     if must_exist and not resolved.is_file():
@@ -313,13 +357,32 @@ def to_repo_relative(path: Path, repo_root: Path) -> str:
     return path.relative_to(repo_root).as_posix()
 
 
+def update_file_digest(digest: hashlib.blake2b, paths: list[Path], repo_root: Path) -> None:
+    for path in paths:
+        digest.update(to_repo_relative(path, repo_root).encode("utf-8") + b"\0")
+        if not path.is_file():
+            digest.update(b"missing\0")
+            continue
+        file_digest = hashlib.blake2b(digest_size=16)
+        with path.open("rb") as handle:
+            while chunk := handle.read(1 << 16):
+                file_digest.update(chunk)
+        digest.update(file_digest.digest())
+
+
+def read_stamp(stamp_path: Path) -> str | None:
+    if not stamp_path.is_file():
+        return None
+    return stamp_path.read_text(encoding="utf-8").strip()
+
+
 def main() -> int:
     args = parse_args()
     errors: list[str] = []
 
     repo_root = Path(__file__).resolve().parent.parent
-    generated_root = repo_root / "docs/generated"
-    contracts_root = repo_root / "contracts"
+    generated_root = (repo_root / "docs/generated").resolve()
+    contracts_root = (repo_root / "contracts").resolve()
 
     try:
         rest_path = sanitize_repo_relative_path(
@@ -354,6 +417,20 @@ def main() -> int:
         print(f"error: {err}", file=sys.stderr)
         return 2
 
+    # The stamp lives outside the committed artifact and also covers the current bundle,
+    # so a hand-edited or deleted output never matches and is always rebuilt.
+    stamp_path = repo_root / BUNDLE_STAMP_PATH
+    input_digest = hashlib.blake2b(digest_size=16)
+    update_file_digest(
+        input_digest,
+        [rest_path, grpc_path, links_path, Path(__file__).resolve()],
+        repo_root,
+    )
+    stamp_digest = input_digest.copy()
+    update_file_digest(stamp_digest, [out_path], repo_root)
+    if not args.force and read_stamp(stamp_path) == stamp_digest.hexdigest():
+        return 0
+
     rest_openapi = load_json(rest_path)
     grpc_openapi = load_json(grpc_path)
 
@@ -375,28 +452,32 @@ def main() -> int:
         errors,
     )
 
-    for operation_id in allow_unmapped_rest:
-        if operation_id not in rest_by_id:
-            errors.append(
-                "coverage.allow_unmapped_rest_operation_ids contains unknown operationId: "
-                f"{operation_id}"
-            )
-    for grpc_method in allow_unmapped_grpc:
-        if grpc_method not in grpc_by_method:
-            errors.append(
-                "coverage.allow_unmapped_grpc_methods contains unknown method: "
-                f"{grpc_method}"
-            )
+    allow_rest_set = set(allow_unmapped_rest)
+    allow_grpc_set = set(allow_unmapped_grpc)
+
+    for operation_id in sorted(allow_rest_set - rest_by_id.keys()):
+        errors.append(
+            "coverage.allow_unmapped_rest_operation_ids contains unknown operationId: "
+            f"{operation_id}"
+        )
+    for grpc_method in sorted(allow_grpc_set - grpc_by_method.keys()):
+        errors.append(
+            "coverage.allow_unmapped_grpc_methods contains unknown method: "
+            f"{grpc_method}"
+        )
 
     normalized_links: list[dict] = []
     seen_rest: set[str] = set()
     seen_grpc: set[str] = set()
+    linked_rest: set[str] = set()
+    linked_grpc: set[str] = set()
 
     for index, link in enumerate(raw_links):
         if not isinstance(link, dict):
             continue
-        operation_id = link.get("rest_operation_id")
-        grpc_method = link.get("grpc_method")
+        get = link.get
+        operation_id = get("rest_operation_id")
+        grpc_method = get("grpc_method")
         if not isinstance(operation_id, str) or not isinstance(grpc_method, str):
             continue
 
@@ -418,7 +499,7 @@ def main() -> int:
             errors.append(f"links[{index}] references unknown grpc_method: {grpc_method}")
             continue
 
-        declared_rest_method = link.get("rest_method")
+        declared_rest_method = get("rest_method")
         if declared_rest_method is not None:
             if (
                 not isinstance(declared_rest_method, str)
@@ -428,7 +509,7 @@ def main() -> int:
                     f"links[{index}] rest_method mismatch for "
                     f"{operation_id}: expected {rest_operation['method']}"
                 )
-        declared_rest_path = link.get("rest_path")
+        declared_rest_path = get("rest_path")
         if declared_rest_path is not None:
             if (
                 not isinstance(declared_rest_path, str)
@@ -447,25 +528,17 @@ def main() -> int:
             "grpc_http_method": grpc_operation["http_method"],
             "grpc_path": grpc_operation["path"],
         }
-        notes = link.get("notes")
-        if isinstance(notes, str) and notes:
+        notes = get("notes")
+        if is_nonempty_str(notes):
             normalized["notes"] = notes
         normalized_links.append(normalized)
+        linked_rest.add(operation_id)
+        linked_grpc.add(grpc_method)
 
     normalized_links.sort(key=lambda item: item["rest_operation_id"])
-    linked_rest = {item["rest_operation_id"] for item in normalized_links}
-    linked_grpc = {item["grpc_method"] for item in normalized_links}
 
-    unmapped_rest = sorted(
-        operation_id
-        for operation_id in rest_by_id
-        if operation_id not in linked_rest and operation_id not in allow_unmapped_rest
-    )
-    unmapped_grpc = sorted(
-        grpc_method
-        for grpc_method in grpc_by_method
-        if grpc_method not in linked_grpc and grpc_method not in allow_unmapped_grpc
-    )
+    unmapped_rest = sorted(rest_by_id.keys() - linked_rest - allow_rest_set)
+    unmapped_grpc = sorted(grpc_by_method.keys() - linked_grpc - allow_grpc_set)
 
     if unmapped_rest:
         errors.append(
@@ -508,9 +581,11 @@ def main() -> int:
     }
 
     out_path.parent.mkdir(parents=True, exist_ok=True)
-    with out_path.open("w", encoding="utf-8") as handle:
-        json.dump(bundle, handle, indent=2, sort_keys=True)
-        handle.write("\n")
+    dump_json(out_path, bundle)
+
+    update_file_digest(input_digest, [out_path], repo_root)
+    stamp_path.parent.mkdir(parents=True, exist_ok=True)
+    stamp_path.write_text(input_digest.hexdigest() + "\n", encoding="utf-8")
     return 0
 
 
@@ -5,7 +5,6 @@ from __future__ import annotations
 
 import argparse
 import base64
-import hashlib
 import hmac
 import json
 import sys
@@ -57,11 +56,7 @@ def main() -> int:
     payload_part = b64url(json.dumps(payload, separators=(",", ":"), sort_keys=True).encode())
 
     signing_input = f"{header_part}.{payload_part}".encode("ascii")
-    signature = hmac.new(
-        args.secret.encode("utf-8"),
-        signing_input,
-        hashlib.sha256,
-    ).digest()
+    signature = hmac.digest(args.secret.encode("utf-8"), signing_input, "sha256")
     token = f"{header_part}.{payload_part}.{b64url(signature)}"
 
     sys.stdout.write(token)
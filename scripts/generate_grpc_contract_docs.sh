@@ -4,6 +4,63 @@ set -euo pipefail
 ROOT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/.." && pwd)"
 cd "$ROOT_DIR"
 
+OPENPORTIO_CONTRACT_DOCS_FORCE="${OPENPORTIO_CONTRACT_DOCS_FORCE:-false}"
+
+STAMP_FILE="target/contract-docs/grpc-docgen.stamp"
+# Cargo.lock is untracked but pins protoc-bin-vendored, prost-types, and serde_json,
+# which all shape the docgen output; it is hashed as "missing" when absent.
+DOCGEN_INPUTS=(
+  Cargo.toml
+  Cargo.lock
+  crates/openportio-rpc/Cargo.toml
+  crates/openportio-rpc/src/bin/grpc_docgen.rs
+  scripts/generate_grpc_contract_docs.sh
+)
+DOCGEN_OUTPUTS=(
+  docs/generated/grpc-contracts.md
+  docs/generated/grpc-openapi-bridge.json
+  crates/openportio-rpc/generated/grpc-contracts.md
+  crates/openportio-rpc/generated/grpc-openapi-bridge.json
+)
+
+is_truthy() {
+  case "$(printf '%s' "$1" | tr '[:upper:]' '[:lower:]')" in
+    1|true|yes|on) return 0 ;;
+    *) return 1 ;;
+  esac
+}
+
+sha256_stream() {
+  if command -v sha256sum >/dev/null 2>&1; then
+    sha256sum | cut -d' ' -f1
+  else
+    shasum -a 256 | cut -d' ' -f1
+  fi
+}
+
+# Digest of every proto source, the docgen itself, and the current outputs, so a
+# hand-edited or deleted artifact never matches a stale stamp.
+docgen_digest() {
+  local file
+  {
+    find crates/openportio-rpc/proto -type f -name '*.proto' | LC_ALL=C sort
+    printf '%s\n' "${DOCGEN_INPUTS[@]}" "${DOCGEN_OUTPUTS[@]}"
+  } | while IFS= read -r file; do
+    printf '%s\n' "$file"
+    if [[ -f "$file" ]]; then
+      sha256_stream <"$file"
+    else
+      echo "missing"
+    fi
+  done | sha256_stream
+}
+
+if ! is_truthy "$OPENPORTIO_CONTRACT_DOCS_FORCE" && [[ -f "$STAMP_FILE" ]] \
+  && [[ "$(cat "$STAMP_FILE")" == "$(docgen_digest)" ]]; then
+  echo "gRPC contract docs unchanged since last run; skipping grpc-docgen."
+  exit 0
+fi
+
 cargo run -p openportio-rpc --bin grpc-docgen -- \
   --proto crates/openportio-rpc/proto/service.proto \
   --include crates/openportio-rpc/proto \
@@ -13,3 +70,6 @@ cargo run -p openportio-rpc --bin grpc-docgen -- \
 mkdir -p crates/openportio-rpc/generated
 cp docs/generated/grpc-contracts.md crates/openportio-rpc/generated/grpc-contracts.md
 cp docs/generated/grpc-openapi-bridge.json crates/openportio-rpc/generated/grpc-openapi-bridge.json
+
+mkdir -p "$(dirname "$STAMP_FILE")"
+docgen_digest >"$STAMP_FILE"
@@ -127,12 +127,14 @@ summary_path = sys.argv[1]
 expected_p95_ms = float(sys.argv[2])
 expected_err_rate = float(sys.argv[3])
 
+DURATION_RE = re.compile(r"([0-9]+(?:\.[0-9]+)?)(ns|us|µs|ms|s|m|h)")
+
 with open(summary_path, "r", encoding="utf-8") as fh:
     payload = json.load(fh)
 
 def duration_to_ms(value: str) -> float:
     value = value.strip()
-    m = re.fullmatch(r"([0-9]+(?:\.[0-9]+)?)(ns|us|µs|ms|s|m|h)", value)
+    m = DURATION_RE.fullmatch(value)
     if not m:
         raise ValueError(f"unsupported duration format: {value}")
     amount = float(m.group(1))